@@ -0,0 +1,636 @@
+#!/usr/bin/env python3
+"""Read-only query API over league history (H2H.json + Rivalries.json)
+
+Loads the history once, builds in-memory indexes and answers the same questions
+the site derives client-side (opponent breakdown, rivalry group records,
+week-by-week game lists, facet filters) so other tools don't have to re-parse
+JSON or re-implement the aggregation.
+
+Semantics mirror js/app.js:
+- games are de-duplicated with the same canonical key as dedupeGames()
+- weeks are derived per team from game dates (deriveWeeksInPlace())
+- blank type => "Regular", blank round => "" (normType() / normRound())
+- group records vs. a team use the group's members minus that team (aggregateVsOpps())
+
+Indexes are Python ints used as bitsets over game positions (games are kept in
+date order), so every filter is a handful of ANDs/ORs. Rivalry groups also get a
+member bitset over team ids.
+
+Endpoints (all GET, JSON):
+  /meta                      data version, file paths, counts
+  /teams                     all teams
+  /rivalries                 Rivalries.json groups
+  /games?...                 filtered game list (newest -> oldest)
+  /record?team=...&...       W-L-T, PF/PA, PPG/OPPG for a team within filters
+  /splits?by=...&...         per-key records; by=opp|season|type|round|week with
+                             team=, or by=team (league-wide Team Breakdown)
+
+Filters (repeat the param or comma-separate values):
+  team, opp, season, week, type, round, group (rivalry slug)
+  opp/week are evaluated from team's side when team is given.
+
+Responses carry a strong ETag and honor If-None-Match (304). Bodies are gzipped
+when the client sends Accept-Encoding: gzip. Data files are re-stat'ed at most
+every --reload-interval seconds and the indexes rebuilt when they change.
+
+Usage:
+  python3 h2h_api.py --h2h ../assets/H2H.json --rivalries ../assets/Rivalries.json --port 8765
+  curl 'http://127.0.0.1:8765/record?team=Joe&group=texans'
+
+Tests (repo root; also checks parity with js/app.js when node is installed):
+  python3 -m unittest discover -s test -p 'test_*.py'
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+GZIP_MIN_BYTES = 512
+RESPONSE_CACHE_SIZE = 1024
+FILTER_KEYS = ("team", "opp", "season", "week", "type", "round", "group")
+SPLIT_KEYS = ("opp", "season", "type", "round", "week", "team")
+
+
+class QueryError(ValueError):
+    """Bad request parameters; reported to the client as HTTP 400."""
+
+
+# ---------------- Data helpers (mirror js/app.js) ----------------
+def load_json(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def norm_type(t):
+    return t if (t and str(t).strip()) else "Regular"
+
+def norm_round(r):
+    return r or ""
+
+def canonical_game_key(g):
+    t1, t2 = g.get("teamA"), g.get("teamB")
+    s1, s2 = float(g.get("scoreA") or 0), float(g.get("scoreB") or 0)
+    gtype = str(g.get("type") or "").strip().lower()
+    rnd = str(g.get("round") or "").strip().lower()
+    head = f"{g.get('season')}|{g.get('date')}|{gtype}|{rnd}"
+    if t1 < t2:
+        return f"{head}|{t1}|{s1:.3f}|{t2}|{s2:.3f}"
+    return f"{head}|{t2}|{s2:.3f}|{t1}|{s1:.3f}"
+
+def is_game_row(g):
+    """A row needs two named teams to be indexed as a matchup."""
+    return (
+        isinstance(g, dict)
+        and isinstance(g.get("teamA"), str) and g["teamA"].strip() != ""
+        and isinstance(g.get("teamB"), str) and g["teamB"].strip() != ""
+    )
+
+def derive_weeks(games):
+    """Per-team week numbers by date order within a season; games must be date-sorted."""
+    week_by_team = [dict() for _ in games]
+    seen = {}  # (season, team) -> (last_date, idx)
+    for i, g in enumerate(games):
+        for team in (g["teamA"], g["teamB"]):
+            key = (g["season"], team)
+            last_date, idx = seen.get(key, (None, 0))
+            if g["date"] != last_date:
+                idx += 1
+                seen[key] = (g["date"], idx)
+            week_by_team[i][team] = idx
+    return week_by_team
+
+def iter_bits(bits: int):
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+def side_for_team(g, team):
+    if g["teamA"] == team:
+        pf, pa, opp = g["scoreA"], g["scoreB"], g["teamB"]
+    elif g["teamB"] == team:
+        pf, pa, opp = g["scoreB"], g["scoreA"], g["teamA"]
+    else:
+        return None
+    result = "W" if pf > pa else "L" if pf < pa else "T"
+    return pf, pa, opp, result
+
+def new_record():
+    return {"w": 0, "l": 0, "t": 0, "pf": 0.0, "pa": 0.0, "n": 0}
+
+def add_to_record(rec, pf, pa, result):
+    if result == "W":
+        rec["w"] += 1
+    elif result == "L":
+        rec["l"] += 1
+    else:
+        rec["t"] += 1
+    rec["pf"] += pf
+    rec["pa"] += pa
+    rec["n"] += 1
+
+def finish_record(rec):
+    n = rec["n"]
+    played = rec["w"] + rec["l"] + rec["t"]
+    rec["pct"] = round((rec["w"] + 0.5 * rec["t"]) / played, 4) if played else 0.0
+    rec["ppg"] = round(rec["pf"] / n, 2) if n else 0.0
+    rec["oppg"] = round(rec["pa"] / n, 2) if n else 0.0
+    rec["pf"] = round(rec["pf"], 2)
+    rec["pa"] = round(rec["pa"], 2)
+    return rec
+
+
+# ---------------- Index ----------------
+class LeagueIndex:
+    """Immutable snapshot of the history plus bitset indexes over it."""
+
+    def __init__(self, raw_games, rivalries):
+        # Same canonical key as dedupeGames(); malformed rows are skipped and reported
+        # so one bad append to H2H.json can't take the whole index down.
+        games = []
+        seen = set()
+        self.skipped = 0
+        for g in raw_games:
+            if not is_game_row(g):
+                self.skipped += 1
+                continue
+            try:
+                key = canonical_game_key(g)
+                row = {
+                    "season": int(g.get("season") or 0),
+                    "date": str(g.get("date") or ""),
+                    "teamA": g["teamA"],
+                    "teamB": g["teamB"],
+                    "scoreA": float(g.get("scoreA") or 0),
+                    "scoreB": float(g.get("scoreB") or 0),
+                    "type": norm_type(str(g.get("type") or "")),
+                    "round": norm_round(str(g.get("round") or "")),
+                }
+            except (TypeError, ValueError):
+                self.skipped += 1
+                continue
+            if key in seen:
+                continue
+            seen.add(key)
+            games.append(row)
+        if self.skipped:
+            print(f"[h2h_api] Skipped {self.skipped} malformed game row(s) (missing teams or non-numeric season/score).", file=sys.stderr)
+        games.sort(key=lambda g: (g["date"], g["season"]))
+        self.games = games
+        self.week_by_team = derive_weeks(games)
+
+        self.all_bits = (1 << len(games)) - 1
+        self.by_team = {}
+        self.by_pair = {}
+        self.by_season = {}
+        self.by_type = {}
+        self.by_round = {}
+        self.by_team_week = {}
+        for i, g in enumerate(games):
+            bit = 1 << i
+            a, b = g["teamA"], g["teamB"]
+            for team in (a, b):
+                self.by_team[team] = self.by_team.get(team, 0) | bit
+                tw = (team, self.week_by_team[i][team])
+                self.by_team_week[tw] = self.by_team_week.get(tw, 0) | bit
+            pair = frozenset((a, b))
+            self.by_pair[pair] = self.by_pair.get(pair, 0) | bit
+            self.by_season[g["season"]] = self.by_season.get(g["season"], 0) | bit
+            self.by_type[g["type"]] = self.by_type.get(g["type"], 0) | bit
+            if g["round"]:
+                self.by_round[g["round"]] = self.by_round.get(g["round"], 0) | bit
+
+        self.teams = sorted(self.by_team)
+        self.team_ids = {team: i for i, team in enumerate(self.teams)}
+        # Exact names win (js/app.js keeps "Joe" and "joe" apart); the lowercase map
+        # is only a fallback, first spelling wins.
+        self.teams_lower = {}
+        for team in self.teams:
+            self.teams_lower.setdefault(team.lower(), team)
+        self.types_lower = {}
+        for t in self.by_type:
+            self.types_lower.setdefault(t.strip().lower(), []).append(t)
+        self.rounds_lower = {}
+        for r in self.by_round:
+            self.rounds_lower.setdefault(r.strip().lower(), []).append(r)
+
+        self.rivalries = rivalries if isinstance(rivalries, list) else []
+        self.groups = {}
+        for r in self.rivalries:
+            if not isinstance(r, dict) or str(r.get("type") or "group").lower() != "group" or not isinstance(r.get("slug"), str) or not r["slug"]:
+                continue
+            raw_members = r.get("members") if isinstance(r.get("members"), list) else []
+            members = [self._resolve_team(m) for m in raw_members if isinstance(m, str)]
+            members = [m for m in members if m is not None]
+            mask = 0
+            for m in members:
+                mask |= 1 << self.team_ids[m]
+            self.groups[r["slug"].strip().lower()] = {
+                "slug": r["slug"], "name": str(r.get("name") or r["slug"]), "members": members, "mask": mask,
+            }
+
+    # ---- filtering ----
+    def _resolve_team(self, name):
+        name = str(name)
+        if name in self.team_ids:
+            return name
+        return self.teams_lower.get(name.lower())
+
+    def _team(self, name):
+        team = self._resolve_team(name)
+        if team is None:
+            raise QueryError(f"unknown team: {name}")
+        return team
+
+    def _facet_keys(self, lookup, values, label):
+        keys = []
+        for v in values:
+            found = lookup.get(str(v).strip().lower())
+            if found is None:
+                raise QueryError(f"unknown {label}: {v}")
+            keys.extend(found)
+        return keys
+
+    def _union(self, index, keys):
+        bits = 0
+        for k in keys:
+            bits |= index.get(k, 0)
+        return bits
+
+    def _members_mask(self, names):
+        mask = 0
+        for name in names:
+            mask |= 1 << self.team_ids[name]
+        return mask
+
+    def _opp_bits(self, team, opp_mask):
+        bits = 0
+        for pair, pair_bits in self.by_pair.items():
+            other = [t for t in pair if t != team]
+            if len(other) == 1 and (opp_mask >> self.team_ids[other[0]]) & 1:
+                bits |= pair_bits
+        return bits
+
+    def select(self, params):
+        """Resolve filters to (team or None, game bitset)."""
+        teams = params.get("team") or []
+        if len(teams) > 1:
+            raise QueryError("team accepts a single value")
+        team = self._team(teams[0]) if teams else None
+        bits = self.by_team[team] if team else self.all_bits
+
+        if params.get("season"):
+            try:
+                seasons = [int(s) for s in params["season"]]
+            except ValueError:
+                raise QueryError("season must be an integer")
+            bits &= self._union(self.by_season, seasons)
+
+        if params.get("type"):
+            bits &= self._union(self.by_type, self._facet_keys(self.types_lower, params["type"], "type"))
+
+        if params.get("round"):
+            bits &= self._union(self.by_round, self._facet_keys(self.rounds_lower, params["round"], "round"))
+
+        if params.get("week"):
+            try:
+                weeks = [int(w) for w in params["week"]]
+            except ValueError:
+                raise QueryError("week must be an integer")
+            week_teams = [team] if team else self.teams
+            bits &= self._union(self.by_team_week, [(t, w) for t in week_teams for w in weeks])
+
+        opp_mask = None
+        if params.get("opp"):
+            if not team:
+                raise QueryError("opp requires team")
+            opp_mask = self._members_mask(self._team(o) for o in params["opp"])
+
+        if params.get("group"):
+            group_mask = 0
+            for slug in params["group"]:
+                grp = self.groups.get(slug.strip().lower())
+                if grp is None:
+                    raise QueryError(f"unknown group: {slug}")
+                group_mask |= grp["mask"]
+            if team:
+                group_mask &= ~(1 << self.team_ids[team])
+                opp_mask = group_mask if opp_mask is None else (opp_mask & group_mask)
+            else:
+                # League-wide: games played between two members of the group.
+                bits &= self._intra_group_bits(group_mask)
+
+        if opp_mask is not None:
+            bits &= self._opp_bits(team, opp_mask)
+
+        return team, bits
+
+    def _intra_group_bits(self, mask):
+        bits = 0
+        for pair, pair_bits in self.by_pair.items():
+            if all((mask >> self.team_ids[t]) & 1 for t in pair):
+                bits |= pair_bits
+        return bits
+
+    # ---- answers ----
+    def game_list(self, team, bits):
+        out = []
+        for i in reversed(list(iter_bits(bits))):
+            g = self.games[i]
+            row = dict(g)
+            if team:
+                pf, pa, opp, result = side_for_team(g, team)
+                row.update({"week": self.week_by_team[i][team], "opp": opp, "result": result, "pf": pf, "pa": pa})
+            else:
+                row["weekByTeam"] = self.week_by_team[i]
+            out.append(row)
+        return out
+
+    def record(self, team, bits):
+        rec = new_record()
+        for i in iter_bits(bits):
+            pf, pa, _, result = side_for_team(self.games[i], team)
+            add_to_record(rec, pf, pa, result)
+        return finish_record(rec)
+
+    def splits(self, team, bits, by, weeks=None):
+        recs = {}
+        if by == "team":
+            if team:
+                raise QueryError("by=team is league-wide; drop team or use by=opp")
+            for i in iter_bits(bits):
+                g = self.games[i]
+                for side in (g["teamA"], g["teamB"]):
+                    if weeks and self.week_by_team[i][side] not in weeks:
+                        continue
+                    pf, pa, _, result = side_for_team(g, side)
+                    add_to_record(recs.setdefault(side, new_record()), pf, pa, result)
+        else:
+            if not team:
+                raise QueryError(f"by={by} requires team")
+            for i in iter_bits(bits):
+                g = self.games[i]
+                pf, pa, opp, result = side_for_team(g, team)
+                key = {
+                    "opp": opp,
+                    "season": g["season"],
+                    "type": g["type"],
+                    "round": g["round"],
+                    "week": self.week_by_team[i][team],
+                }[by]
+                add_to_record(recs.setdefault(key, new_record()), pf, pa, result)
+
+        rows = [dict(key=k, **finish_record(r)) for k, r in recs.items()]
+        if by in ("opp", "team"):
+            rows.sort(key=lambda r: (-r["pct"], -r["w"], r["l"], str(r["key"])))
+        else:
+            rows.sort(key=lambda r: (r["key"] == "", r["key"]))
+        return rows
+
+
+# ---------------- Store (hot reload + response cache) ----------------
+def file_signature(path):
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+# One immutable unit per load; published with a single assignment so a request
+# never pairs one load's index with another load's version or cache.
+Snapshot = namedtuple("Snapshot", "index version cache loaded_at")
+
+class Store:
+    def __init__(self, h2h_path, rivalries_path, reload_interval=1.0, cache_size=RESPONSE_CACHE_SIZE):
+        self.h2h_path = h2h_path
+        self.rivalries_path = rivalries_path
+        self.reload_interval = reload_interval
+        self.cache_size = cache_size
+        self.lock = threading.Lock()
+        self.cache_lock = threading.Lock()
+        self.last_check = 0.0
+        self.signature = None
+        self.snapshot = None
+        self.reload(force=True)
+
+    def _signature(self):
+        return (file_signature(self.h2h_path), file_signature(self.rivalries_path))
+
+    def reload(self, force=False):
+        sig = self._signature()
+        if not force and sig == self.signature:
+            return False
+        raw_games = load_json(self.h2h_path)
+        if not isinstance(raw_games, list):
+            raise ValueError("H2H.json must be a list")
+        try:
+            rivalries = load_json(self.rivalries_path)
+        except (OSError, ValueError):
+            if self.snapshot is not None:
+                # Hot reload with the file mid-write/malformed: keep the groups we already have.
+                print(f"[h2h_api] {self.rivalries_path} unreadable - keeping previous rivalry groups.", file=sys.stderr)
+                rivalries = self.snapshot.index.rivalries
+            else:
+                print(f"[h2h_api] {self.rivalries_path} missing or unreadable - rivalry groups disabled.", file=sys.stderr)
+                rivalries = []
+        index = LeagueIndex(raw_games, rivalries)
+        version = hashlib.sha1(repr(sig).encode("utf-8")).hexdigest()[:12]
+        self.snapshot = Snapshot(index, version, OrderedDict(), time.time())
+        self.signature = sig
+        print(f"[h2h_api] Loaded {len(index.games)} games, {len(index.groups)} groups (version {version}).", file=sys.stderr)
+        return True
+
+    def current(self):
+        now = time.monotonic()
+        if now - self.last_check >= self.reload_interval:
+            with self.lock:
+                if now - self.last_check >= self.reload_interval:
+                    self.last_check = now
+                    try:
+                        self.reload()
+                    except Exception as e:
+                        # Keep serving the last good snapshot while a file is mid-write or malformed.
+                        print(f"[h2h_api] Reload failed, keeping version {self.snapshot.version}: {e}", file=sys.stderr)
+        return self.snapshot
+
+
+def parse_params(query):
+    params = {}
+    for key, values in parse_qs(query, keep_blank_values=False).items():
+        vals = [v.strip() for raw in values for v in raw.split(",") if v.strip()]
+        if vals:
+            params[key] = vals
+    return params
+
+def accepts_gzip(header):
+    """True if Accept-Encoding allows gzip (explicitly or via *) with q > 0."""
+    qvalues = {}
+    for part in (header or "").split(","):
+        coding, _, rest = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in rest.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qvalues[coding] = q
+    if "gzip" in qvalues:
+        return qvalues["gzip"] > 0
+    return qvalues.get("*", 0) > 0
+
+def answer(store, snapshot, path, params):
+    index = snapshot.index
+    if path == "/meta":
+        return {
+            "version": snapshot.version,
+            "loadedAt": int(snapshot.loaded_at),
+            "h2h": store.h2h_path,
+            "rivalries": store.rivalries_path,
+            "games": len(index.games),
+            "teams": len(index.teams),
+            "seasons": sorted(index.by_season),
+            "types": sorted(index.by_type),
+            "rounds": sorted(index.by_round),
+        }
+    if path == "/teams":
+        return index.teams
+    if path == "/rivalries":
+        return [{"slug": g["slug"], "name": g["name"], "members": g["members"]} for g in index.groups.values()]
+
+    unknown = set(params) - set(FILTER_KEYS) - {"by"}
+    if unknown:
+        raise QueryError(f"unknown parameter(s): {', '.join(sorted(unknown))}")
+    team, bits = index.select(params)
+
+    if path == "/games":
+        return index.game_list(team, bits)
+    if path == "/record":
+        if not team:
+            raise QueryError("record requires team")
+        return index.record(team, bits)
+    if path == "/splits":
+        by = (params.get("by") or ["team" if not team else "opp"])[0]
+        if by not in SPLIT_KEYS:
+            raise QueryError(f"by must be one of: {', '.join(SPLIT_KEYS)}")
+        weeks = {int(w) for w in params.get("week", [])}
+        return index.splits(team, bits, by, weeks)
+    return None
+
+
+# ---------------- HTTP ----------------
+class Handler(BaseHTTPRequestHandler):
+    server_version = "VivaH2H/1.0"
+    store = None  # set in main()
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def do_GET(self):
+        snapshot = self.store.current()
+        cache = snapshot.cache
+        url = urlsplit(self.path)
+        params = parse_params(url.query)
+        cache_key = (url.path, tuple(sorted((k, tuple(v)) for k, v in params.items())))
+
+        with self.store.cache_lock:
+            entry = cache.get(cache_key)
+            if entry is not None:
+                cache.move_to_end(cache_key)
+        if entry is None:
+            try:
+                payload = answer(self.store, snapshot, url.path, params)
+                if payload is None:
+                    return self.send_json_error(404, f"no such endpoint: {url.path}")
+                body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            except QueryError as e:
+                return self.send_json_error(400, str(e))
+            except Exception as e:
+                self.log_error("Unhandled error for %s: %r", self.path, e)
+                return self.send_json_error(500, "internal error")
+            etag = '"%s-%s"' % (snapshot.version, hashlib.sha1(body).hexdigest()[:16])
+            gz = gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_BYTES else None
+            entry = (body, gz, etag)
+            with self.store.cache_lock:
+                # LRU: hits move to the end, so the oldest untouched query is evicted first.
+                if len(cache) >= self.store.cache_size:
+                    cache.popitem(last=False)
+                cache[cache_key] = entry
+        body, gz, etag = entry
+
+        # Each representation gets its own strong validator; either one revalidates.
+        gz_etag = etag[:-1] + '-gz"'
+        use_gzip = gz is not None and accepts_gzip(self.headers.get("Accept-Encoding"))
+        data, sent_etag = (gz, gz_etag) if use_gzip else (body, etag)
+
+        inm = self.headers.get("If-None-Match")
+        if inm:
+            tags = [t.strip().replace("W/", "", 1) for t in inm.split(",")]
+            if "*" in tags or etag in tags or gz_etag in tags:
+                self.send_response(304)
+                self.send_common_headers(sent_etag)
+                self.end_headers()
+                return
+
+        self.send_response(200)
+        self.send_common_headers(sent_etag)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_common_headers(self, etag):
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Access-Control-Allow-Origin", "*")
+
+    def send_json_error(self, code, message):
+        body = json.dumps({"error": message}).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def main():
+    here = os.path.dirname(os.path.abspath(__file__))
+    assets = os.path.join(here, "..", "assets")
+    p = argparse.ArgumentParser(description="Read-only query API over league history")
+    p.add_argument("--h2h", default=os.path.join(assets, "H2H.json"), help="Path to H2H.json")
+    p.add_argument("--rivalries", default=os.path.join(assets, "Rivalries.json"), help="Path to Rivalries.json")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--reload-interval", type=float, default=1.0, help="Seconds between data file checks (default 1.0)")
+    p.add_argument("--verbose", action="store_true", help="Log every request")
+    args = p.parse_args()
+
+    Handler.store = Store(os.path.normpath(args.h2h), os.path.normpath(args.rivalries), args.reload_interval)
+    httpd = ThreadingHTTPServer((args.host, args.port), Handler)
+    httpd.verbose = args.verbose
+    print(f"[h2h_api] Serving on http://{args.host}:{args.port}", file=sys.stderr)
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+if __name__ == "__main__":
+    main()
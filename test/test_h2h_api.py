@@ -0,0 +1,273 @@
+"""Tests for scripts/h2h_api.py.
+
+Run from the repo root:
+  python3 -m unittest discover -s test -p 'test_*.py'
+"""
+import contextlib
+import gzip
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ASSETS = os.path.join(ROOT, "assets")
+H2H_PATH = os.path.join(ASSETS, "H2H.json")
+RIVALRIES_PATH = os.path.join(ASSETS, "Rivalries.json")
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+
+import h2h_api  # noqa: E402
+
+
+def record_wlt(rec):
+    return (rec["w"], rec["l"], rec["t"])
+
+
+class LeagueIndexTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.index = h2h_api.LeagueIndex(h2h_api.load_json(H2H_PATH), h2h_api.load_json(RIVALRIES_PATH))
+
+    def record(self, **params):
+        team, bits = self.index.select({k: v.split(",") for k, v in params.items()})
+        return self.index.record(team, bits)
+
+    def test_team_records(self):
+        self.assertEqual(record_wlt(self.record(team="Joe")), (34, 29, 0))
+        self.assertEqual(record_wlt(self.record(team="Joe", type="regular")), (30, 26, 0))
+        self.assertEqual(record_wlt(self.record(team="joe", opp="Wei")), (3, 2, 0))
+        self.assertEqual(record_wlt(self.record(team="Wei", type="Playoff")), (3, 4, 0))
+
+    def test_group_records(self):
+        self.assertEqual(record_wlt(self.record(team="Joe", group="texans")), (10, 8, 0))
+        self.assertEqual(record_wlt(self.record(team="Joe", group="Texans")), (10, 8, 0))
+        self.assertEqual(record_wlt(self.record(team="Mino", group="married-to-each-other")), (4, 2, 0))
+        rec = self.record(team="Leah", group="texans", season="2024")
+        self.assertEqual(record_wlt(rec), (0, 3, 0))
+        self.assertEqual(rec["ppg"], 88.39)
+
+    def test_derived_weeks(self):
+        team, bits = self.index.select({"team": ["Joe"], "season": ["2025"], "week": ["1"]})
+        games = self.index.game_list(team, bits)
+        self.assertEqual([(g["date"], g["opp"], g["result"]) for g in games], [("2025-09-04", "Kylie", "L")])
+        team, bits = self.index.select({"team": ["Joe"], "opp": ["Wei"], "type": ["Playoff"]})
+        self.assertEqual([g["week"] for g in self.index.game_list(team, bits)], [15])
+
+    def test_query_errors(self):
+        bad = [
+            {"team": ["Nobody"]},
+            {"team": ["Joe", "Wei"]},
+            {"opp": ["Wei"]},
+            {"team": ["Joe"], "group": ["no-such-group"]},
+            {"type": ["bogus"]},
+            {"round": ["bogus"]},
+            {"season": ["twenty"]},
+        ]
+        for params in bad:
+            with self.subTest(params=params), self.assertRaises(h2h_api.QueryError):
+                self.index.select(params)
+        snapshot = h2h_api.Snapshot(self.index, "test", None, 0)
+        with self.assertRaises(h2h_api.QueryError):
+            h2h_api.answer(None, snapshot, "/record", {})
+        with self.assertRaises(h2h_api.QueryError):
+            h2h_api.answer(None, snapshot, "/splits", {"by": ["season"]})
+
+    def test_malformed_rows_are_skipped(self):
+        raw = h2h_api.load_json(H2H_PATH) + [
+            {"season": 2025, "date": "2025-12-20", "teamA": "Joe", "scoreA": 1, "scoreB": 2},
+            {"season": 2025, "date": "2025-12-20", "teamA": "Joe", "teamB": "Wei", "scoreA": "x", "scoreB": 2},
+        ]
+        rivalries = h2h_api.load_json(RIVALRIES_PATH) + [{"slug": "odd", "members": ["Joe", 7]}, "junk"]
+        index = h2h_api.LeagueIndex(raw, rivalries)
+        self.assertEqual(index.skipped, 2)
+        self.assertEqual(len(index.games), len(self.index.games))
+        self.assertEqual(index.groups["odd"]["members"], ["Joe"])
+
+    @unittest.skipUnless(shutil.which("node"), "node not installed")
+    def test_matches_app_js(self):
+        # dedupeGames()/deriveWeeksInPlace() straight from js/app.js.
+        script = (
+            "global.window={addEventListener(){}};"
+            "const a=require('./js/app.js');"
+            "const g=a.dedupeGames(require('./assets/H2H.json'));"
+            "a.deriveWeeksInPlace(g);"
+            "console.log(JSON.stringify(g.map(x=>[x.season,x.date,x.teamA,x.teamB,+x.scoreA,+x.scoreB,"
+            "x._weekByTeam[x.teamA],x._weekByTeam[x.teamB]])));"
+        )
+        out = subprocess.run(["node", "-e", script], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+        js_rows = sorted(tuple(r) for r in json.loads(out))
+        py_rows = sorted(
+            (g["season"], g["date"], g["teamA"], g["teamB"], g["scoreA"], g["scoreB"],
+             self.index.week_by_team[i][g["teamA"]], self.index.week_by_team[i][g["teamB"]])
+            for i, g in enumerate(self.index.games)
+        )
+        self.assertEqual(py_rows, js_rows)
+
+
+def serve(store):
+    handler = type("TestHandler", (h2h_api.Handler,), {"store": store})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    httpd.verbose = False
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd, "http://127.0.0.1:%d" % httpd.server_address[1]
+
+
+def http_get(base, path, headers=None):
+    try:
+        resp = urlopen(Request(base + path, headers=headers or {}), timeout=10)
+    except HTTPError as e:
+        resp = e
+    with resp:
+        return resp.status, resp.headers, resp.read()
+
+
+class HttpTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.httpd, cls.base = serve(h2h_api.Store(H2H_PATH, RIVALRIES_PATH, reload_interval=60))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.httpd.shutdown()
+        cls.httpd.server_close()
+
+    def get(self, path, headers=None):
+        return http_get(self.base, path, headers)
+
+    def test_etag_and_gzip(self):
+        status, headers, body = self.get("/games?team=Joe", {"Accept-Encoding": "gzip"})
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["Content-Encoding"], "gzip")
+        games = json.loads(gzip.decompress(body))
+        self.assertEqual(len(games), 63)
+
+        gz_etag = headers["ETag"]
+        status, headers, body = self.get("/games?team=Joe", {"Accept-Encoding": "gzip", "If-None-Match": gz_etag})
+        self.assertEqual(status, 304)
+        self.assertEqual(headers["ETag"], gz_etag)
+        self.assertEqual(body, b"")
+
+        # Identity body has its own validator; gzip;q=0 means "not gzip".
+        status, headers, body = self.get("/games?team=Joe", {"Accept-Encoding": "gzip;q=0"})
+        self.assertEqual(status, 200)
+        self.assertIsNone(headers["Content-Encoding"])
+        self.assertEqual(len(json.loads(body)), 63)
+        self.assertNotEqual(headers["ETag"], gz_etag)
+        status, _, _ = self.get("/games?team=Joe", {"If-None-Match": gz_etag})
+        self.assertEqual(status, 304)
+
+    def test_accepts_gzip(self):
+        self.assertTrue(h2h_api.accepts_gzip("gzip, deflate"))
+        self.assertTrue(h2h_api.accepts_gzip("br;q=1.0, *;q=0.5"))
+        self.assertFalse(h2h_api.accepts_gzip("gzip;q=0"))
+        self.assertFalse(h2h_api.accepts_gzip("gzip; q=0.0, *"))
+        self.assertFalse(h2h_api.accepts_gzip(""))
+        self.assertFalse(h2h_api.accepts_gzip("identity"))
+
+    def test_error_statuses(self):
+        status, _, body = self.get("/record?team=Joe&type=bogus")
+        self.assertEqual(status, 400)
+        self.assertIn("unknown type", json.loads(body)["error"])
+        status, _, _ = self.get("/nope")
+        self.assertEqual(status, 404)
+
+
+class ReloadTest(unittest.TestCase):
+    """Hot reload and response cache against temp copies of the assets."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.h2h = os.path.join(self.tmp.name, "H2H.json")
+        self.rivalries = os.path.join(self.tmp.name, "Rivalries.json")
+        shutil.copyfile(H2H_PATH, self.h2h)
+        shutil.copyfile(RIVALRIES_PATH, self.rivalries)
+        self.stderr = io.StringIO()
+        with contextlib.redirect_stderr(self.stderr):
+            self.store = h2h_api.Store(self.h2h, self.rivalries, reload_interval=0, cache_size=2)
+        self.httpd, self.base = serve(self.store)
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        # Bump mtime explicitly so the change is seen even on coarse-mtime filesystems.
+        before = os.stat(path).st_mtime_ns
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.utime(path, ns=(before + 10**9, before + 10**9))
+
+    def get(self, path, headers=None):
+        with contextlib.redirect_stderr(self.stderr):
+            return http_get(self.base, path, headers)
+
+    def current(self):
+        with contextlib.redirect_stderr(self.stderr):
+            return self.store.current()
+
+    def append_game(self):
+        games = h2h_api.load_json(self.h2h)
+        games.append({"season": 2025, "date": "2025-12-30", "teamA": "Joe", "teamB": "Wei",
+                      "scoreA": 150.0, "scoreB": 100.0, "week": 18, "round": None, "type": "Regular"})
+        self.write(self.h2h, json.dumps(games))
+
+    def test_reload_publishes_new_snapshot(self):
+        before = self.current()
+        _, headers, body = self.get("/record?team=Joe")
+        self.assertEqual(json.loads(body)["n"], 63)
+
+        self.append_game()
+        after = self.current()
+        self.assertIsNot(after, before)
+        self.assertNotEqual(after.version, before.version)
+        self.assertIsNot(after.cache, before.cache)
+        # The old snapshot is left intact, so an in-flight request stays self-consistent.
+        self.assertEqual(len(before.index.games), 486)
+        self.assertEqual(len(after.index.games), 487)
+
+        status, new_headers, body = self.get("/record?team=Joe", {"If-None-Match": headers["ETag"]})
+        self.assertEqual(status, 200)
+        self.assertNotEqual(new_headers["ETag"], headers["ETag"])
+        self.assertEqual(json.loads(body)["n"], 64)
+        _, _, meta = self.get("/meta")
+        self.assertEqual(json.loads(meta)["version"], after.version)
+
+    def test_invalid_h2h_keeps_last_snapshot(self):
+        before = self.current()
+        self.write(self.h2h, '[{"teamA":')
+        self.assertIs(self.current(), before)
+        status, _, body = self.get("/record?team=Joe")
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)["n"], 63)
+        self.assertIn("Reload failed", self.stderr.getvalue())
+
+    def test_invalid_rivalries_keeps_groups(self):
+        self.write(self.rivalries, '[{"slug":')
+        self.append_game()
+        after = self.current()
+        self.assertEqual(len(after.index.games), 487)
+        self.assertIn("texans", after.index.groups)
+        status, _, body = self.get("/record?team=Joe&group=texans")
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)["n"], 18)
+
+    def test_cache_is_lru(self):
+        self.get("/record?team=Joe")
+        self.get("/record?team=Wei")
+        self.get("/record?team=Joe")  # hit: Joe becomes most recent
+        self.get("/record?team=Mino")  # evicts Wei, not Joe
+        cached = [dict(params)["team"] for _, params in self.current().cache]
+        self.assertEqual(cached, [("Joe",), ("Mino",)])
+
+
+if __name__ == "__main__":
+    unittest.main()